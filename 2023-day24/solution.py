@@ -1,7 +1,21 @@
+from array import array
+from collections import defaultdict
 from dataclasses import dataclass
+from fractions import Fraction
+from itertools import combinations
+import argparse
 import math
+import re
 
-@dataclass
+try:
+    import numpy as np
+except ImportError:  # the scalar and grid engines work without NumPy
+    np = None
+
+ENGINES = ("scalar", "grid", "numpy")
+INF = float('inf')
+
+@dataclass(slots=True)
 class Hailstone:
     px: int  # position x
     py: int  # position y
@@ -34,39 +48,73 @@ def read_input(filename="input"):
     with open(filename, "r") as f:
         return f.read().strip()
 
+class HailstoneSet:
+    """Struct-of-arrays storage: one int64 array('q') column per Hailstone field.
+    
+    Indexing or iterating yields Hailstone views for the scalar code paths.
+    """
+    FIELDS = ("px", "py", "pz", "vx", "vy", "vz")
+    NUMBER = re.compile(rb"-?\d+")
+    
+    def __init__(self, px=(), py=(), pz=(), vx=(), vy=(), vz=()):
+        self.px, self.py, self.pz = array('q', px), array('q', py), array('q', pz)
+        self.vx, self.vy, self.vz = array('q', vx), array('q', vy), array('q', vz)
+    
+    @classmethod
+    def parse(cls, data: str | bytes) -> "HailstoneSet":
+        """Bulk-parse 'px, py, pz @ vx, vy, vz' lines with one regex scan"""
+        if isinstance(data, str):
+            data = data.encode()
+        values = array('q', map(int, cls.NUMBER.findall(data)))
+        if len(values) % 6:
+            raise ValueError("expected six numbers per hailstone")
+        return cls(*(values[k::6] for k in range(6)))
+    
+    @classmethod
+    def from_stones(cls, stones: list[Hailstone]) -> "HailstoneSet":
+        return cls(*([getattr(stone, field) for stone in stones] for field in cls.FIELDS))
+    
+    def __len__(self):
+        return len(self.px)
+    
+    def __getitem__(self, i: int) -> Hailstone:
+        return Hailstone(self.px[i], self.py[i], self.pz[i], self.vx[i], self.vy[i], self.vz[i])
+    
+    def __iter__(self):
+        return map(Hailstone, self.px, self.py, self.pz, self.vx, self.vy, self.vz)
+    
+    def column(self, field: str):
+        """Zero-copy NumPy int64 view of one column"""
+        return np.frombuffer(getattr(self, field), dtype=np.int64)
+
 def parse_input(data: str) -> list[Hailstone]:
     """Parse input into list of Hailstones"""
-    stones = []
-    for line in data.splitlines():
-        pos, vel = line.split(" @ ")
-        px, py, pz = map(int, pos.split(", "))
-        vx, vy, vz = map(int, vel.split(", "))
-        stones.append(Hailstone(px, py, pz, vx, vy, vz))
-    return stones
+    return list(HailstoneSet.parse(data))
 
-def find_intersection(stone1: Hailstone, stone2: Hailstone) -> tuple[float, float] | None:
-    """Find intersection point of two hailstone paths"""
-    m1 = stone1.get_slope()
-    m2 = stone2.get_slope()
+def line_params(stone: Hailstone) -> tuple[float, float]:
+    """Slope and y-intercept of a stone's path, computed once per stone"""
+    return stone.get_slope(), stone.get_y_intercept()
+
+def intersect_lines(stone1: Hailstone, line1: tuple[float, float],
+                    stone2: Hailstone, line2: tuple[float, float]) -> tuple[float, float] | None:
+    """find_intersection using precomputed line_params"""
+    m1, b1 = line1
+    m2, b2 = line2
     
     # Check if parallel
     if m1 == m2:
         return None
         
     # Handle vertical lines
-    if m1 == float('inf'):
+    if m1 == INF:
         x = stone1.px
-        y = m2 * x + stone2.get_y_intercept()
+        y = m2 * x + b2
         return (x, y)
-    if m2 == float('inf'):
+    if m2 == INF:
         x = stone2.px
-        y = m1 * x + stone1.get_y_intercept()
+        y = m1 * x + b1
         return (x, y)
     
-    # Find intersection using y = mx + b equations
-    b1 = stone1.get_y_intercept()
-    b2 = stone2.get_y_intercept()
-    
     # m1*x + b1 = m2*x + b2
     # (m1-m2)x = b2-b1
     x = (b2 - b1) / (m1 - m2)
@@ -74,138 +122,250 @@ def find_intersection(stone1: Hailstone, stone2: Hailstone) -> tuple[float, floa
     
     return (x, y)
 
-def solve_part1(data: str, min_coord: int, max_coord: int) -> int:
+def find_intersection(stone1: Hailstone, stone2: Hailstone) -> tuple[float, float] | None:
+    """Find intersection point of two hailstone paths"""
+    return intersect_lines(stone1, line_params(stone1), stone2, line_params(stone2))
+
+def crosses_in_area(stone1: Hailstone, line1: tuple[float, float],
+                    stone2: Hailstone, line2: tuple[float, float],
+                    min_coord: int, max_coord: int) -> tuple[float, float] | None:
+    """Return the crossing point if both paths cross inside the area in the future"""
+    intersection = intersect_lines(stone1, line1, stone2, line2)
+    if intersection is None:
+        return None
+    
+    x, y = intersection
+    
+    # Check if intersection is within bounds
+    if not (min_coord <= x <= max_coord and min_coord <= y <= max_coord):
+        return None
+    
+    # Check if intersection is in the future for both stones
+    if not (stone1.is_future_point(x, y) and stone2.is_future_point(x, y)):
+        return None
+    
+    return intersection
+
+def clip_to_area(stone: Hailstone, min_coord: float, max_coord: float) -> tuple[float, float, float, float] | None:
+    """Clip the future part of a stone's path to the test area.
+    
+    Returns the (x0, y0, x1, y1) segment, or None if the path never enters it.
+    """
+    # is_future_point treats a stone with vx == 0 as moving straight up or down
+    if stone.vx == 0:
+        vx, vy = 0, (1 if stone.vy > 0 else -1)
+    else:
+        vx, vy = stone.vx, stone.vy
+    
+    t_lo, t_hi = 0.0, INF
+    for p, v in ((stone.px, vx), (stone.py, vy)):
+        if v == 0:
+            if not min_coord <= p <= max_coord:
+                return None
+            continue
+        t1, t2 = (min_coord - p) / v, (max_coord - p) / v
+        t_lo, t_hi = max(t_lo, min(t1, t2)), min(t_hi, max(t1, t2))
+    
+    if t_lo > t_hi:
+        return None
+    return (stone.px + vx * t_lo, stone.py + vy * t_lo,
+            stone.px + vx * t_hi, stone.py + vy * t_hi)
+
+def _grid_cells(segment, min_coord, cell_size, size):
+    """Yield every grid cell a clipped segment passes through (with a little slack)"""
+    eps = 1e-6
+    x0, y0, x1, y1 = ((c - min_coord) / cell_size for c in segment)
+    if x0 > x1:
+        x0, y0, x1, y1 = x1, y1, x0, y0
+    
+    def clamp(cell):
+        return min(max(cell, 0), size - 1)
+    
+    for col in range(clamp(math.floor(x0 - eps)), clamp(math.floor(x1 + eps)) + 1):
+        # Part of the segment inside this column
+        if x1 > x0:
+            lo_x, hi_x = max(x0, col), min(x1, col + 1)
+            ya = y0 + (y1 - y0) * (lo_x - x0) / (x1 - x0)
+            yb = y0 + (y1 - y0) * (hi_x - x0) / (x1 - x0)
+        else:
+            ya, yb = y0, y1
+        lo_y, hi_y = min(ya, yb), max(ya, yb)
+        for row in range(clamp(math.floor(lo_y - eps)), clamp(math.floor(hi_y + eps)) + 1):
+            yield col * size + row
+
+def count_crossings_grid(stones: list[Hailstone], min_coord: int, max_coord: int, grid_size: int | None = None) -> int:
+    """Count future crossings inside the area, testing only stones that share a grid cell.
+    
+    Paths are clipped to the area and bucketed by the cells they pass through. A
+    crossing is counted only in the cell that contains it, so pairs sharing
+    several cells are not counted twice.
+    """
+    lines = [line_params(stone) for stone in stones]
+    size = grid_size or max(1, min(512, math.isqrt(len(stones))))
+    span = max_coord - min_coord
+    cell_size = span / size if span else 1.0
+    
+    # Pad the clip box so float error never drops a stone that crosses on the edge
+    pad = span * 1e-9
+    buckets = defaultdict(list)
+    for i, stone in enumerate(stones):
+        segment = clip_to_area(stone, min_coord - pad, max_coord + pad)
+        if segment is not None:
+            for cell in _grid_cells(segment, min_coord, cell_size, size):
+                buckets[cell].append(i)
+    
+    def cell_of(x, y):
+        col = min(max(math.floor((x - min_coord) / cell_size), 0), size - 1)
+        row = min(max(math.floor((y - min_coord) / cell_size), 0), size - 1)
+        return col * size + row
+    
+    count = 0
+    for cell, members in buckets.items():
+        for a in range(len(members)):
+            i = members[a]
+            for j in members[a + 1:]:
+                point = crosses_in_area(stones[i], lines[i], stones[j], lines[j], min_coord, max_coord)
+                if point is not None and cell_of(*point) == cell:
+                    count += 1
+    return count
+
+def count_crossings_numpy(stones: list[Hailstone] | HailstoneSet, min_coord: int, max_coord: int, tile: int = 512) -> int:
+    """Count future crossings inside the area with a vectorized all-pairs kernel.
+    
+    Pairs are processed in tile x tile blocks to bound memory. The line crossing
+    is solved (Cramer's rule on the slope-intercept form) with the same float
+    operations as intersect_lines, so the count matches the scalar engine exactly.
+    """
+    if np is None:
+        raise ImportError("the numpy engine needs NumPy installed")
+    if not isinstance(stones, HailstoneSet):
+        stones = HailstoneSet.from_stones(stones)
+    n = len(stones)
+    px, py = stones.column("px").astype(np.float64), stones.column("py").astype(np.float64)
+    vx, vy = stones.column("vx"), stones.column("vy")
+    forward, upward, vertical = vx > 0, vy > 0, vx == 0
+    
+    # line_params for every stone: infinite slope and intercept when vertical
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m = np.where(vertical, INF, vy / vx)
+        b = np.where(vertical, INF, py - m * px)
+    
+    def future(i, x, y):
+        # Hailstone.is_future_point for every stone in the block at once
+        return np.where(vertical[i], (px[i] == x) & ((y > py[i]) == upward[i]),
+                        (x > px[i]) == forward[i])
+    
+    count = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start1 in range(0, n, tile):
+            i = np.arange(start1, min(start1 + tile, n))[:, None]
+            for start2 in range(start1, n, tile):
+                j = np.arange(start2, min(start2 + tile, n))[None, :]
+                m1, b1, m2, b2 = m[i], b[i], m[j], b[j]
+                
+                x = (b2 - b1) / (m1 - m2)
+                x = np.where(vertical[i], px[i], np.where(vertical[j], px[j], x))
+                y = np.where(vertical[i], m2 * x + b2, m1 * x + b1)
+                
+                hit = (j > i) & (m1 != m2)
+                hit &= (min_coord <= x) & (x <= max_coord) & (min_coord <= y) & (y <= max_coord)
+                hit &= future(i, x, y) & future(j, x, y)
+                count += int(hit.sum())
+    
+    return count
+
+def solve_part1(data: str, min_coord: int, max_coord: int, engine: str = "scalar") -> int:
+    if engine == "numpy":
+        return count_crossings_numpy(HailstoneSet.parse(data), min_coord, max_coord)
+    
     stones = parse_input(data)
+    if engine == "grid":
+        return count_crossings_grid(stones, min_coord, max_coord)
+    
+    lines = [line_params(stone) for stone in stones]
     count = 0
     
     # Check each pair of hailstones
     for i in range(len(stones)):
         for j in range(i + 1, len(stones)):
-            intersection = find_intersection(stones[i], stones[j])
-            
-            if intersection is None:
-                continue
-                
-            x, y = intersection
-            
-            # Check if intersection is within bounds
-            if not (min_coord <= x <= max_coord and min_coord <= y <= max_coord):
-                continue
-                
-            # Check if intersection is in the future for both stones
-            if not (stones[i].is_future_point(x, y) and stones[j].is_future_point(x, y)):
-                continue
-                
-            count += 1
+            if crosses_in_area(stones[i], lines[i], stones[j], lines[j], min_coord, max_coord):
+                count += 1
     
     return count
 
-def solve_part2(data: str) -> int:
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1],
+            a[2] * b[0] - a[0] * b[2],
+            a[0] * b[1] - a[1] * b[0])
+
+def rock_equations(stone1: Hailstone, stone2: Hailstone) -> list[tuple[list[int], int]]:
+    """Three linear equations in (px, py, pz, vx, vy, vz) for the rock.
+    
+    The rock hits stone i iff (P - p_i) x (V - v_i) = 0. The P x V term is the
+    same for every stone, so subtracting two stones' equations leaves
+    P x (v2 - v1) + (p2 - p1) x V = p2 x v2 - p1 x v1.
+    """
+    p1, v1 = (stone1.px, stone1.py, stone1.pz), (stone1.vx, stone1.vy, stone1.vz)
+    p2, v2 = (stone2.px, stone2.py, stone2.pz), (stone2.vx, stone2.vy, stone2.vz)
+    wx, wy, wz = (b - a for a, b in zip(v1, v2))
+    ux, uy, uz = (b - a for a, b in zip(p1, p2))
+    rhs = [b - a for a, b in zip(_cross(p1, v1), _cross(p2, v2))]
+    return [
+        ([0, wz, -wy, 0, -uz, uy], rhs[0]),
+        ([-wz, 0, wx, uz, 0, -ux], rhs[1]),
+        ([wy, -wx, 0, -uy, ux, 0], rhs[2]),
+    ]
+
+def solve_linear_exact(equations: list[tuple[list[int], int]]) -> list[Fraction] | None:
+    """Gauss-Jordan elimination over Fractions; None if the system is singular"""
+    rows = [[Fraction(c) for c in coeffs] + [Fraction(rhs)] for coeffs, rhs in equations]
+    size = len(rows)
+    for col in range(size):
+        pivot = next((r for r in range(col, size) if rows[r][col] != 0), None)
+        if pivot is None:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        pivot_row = rows[col]
+        for r in range(size):
+            if r != col and rows[r][col] != 0:
+                factor = rows[r][col] / pivot_row[col]
+                rows[r] = [a - factor * b for a, b in zip(rows[r], pivot_row)]
+    return [rows[r][size] / rows[r][r] for r in range(size)]
+
+def rock_hits(position, velocity, stone: Hailstone) -> bool:
+    """Check the rock meets the stone at some time t >= 0"""
+    p = (stone.px, stone.py, stone.pz)
+    v = (stone.vx, stone.vy, stone.vz)
+    times = {(a - b) / (c - d) for a, b, c, d in zip(p, position, velocity, v) if c != d}
+    if not times:
+        return tuple(position) == p  # same velocity: must already be together
+    if len(times) != 1:
+        return False
+    t = times.pop()
+    return t >= 0 and all(a + t * c == b + t * d for a, b, c, d in zip(position, p, velocity, v))
+
+def solve_part2(data: str) -> int | None:
     stones = parse_input(data)
     
-    # Take first 3 hailstones
-    h1, h2, h3 = stones[:3]
-    
-    # For each intersection:
-    # p + t*v = h.p + t*h.v
-    # This gives us:
-    # p.x + t*v.x = h.px + t*h.vx
-    # p.y + t*v.y = h.py + t*h.vy
-    # p.z + t*v.z = h.pz + t*h.vz
-    
-    # Try reasonable velocity ranges
-    max_v = max(abs(max(h.vx, h.vy, h.vz)) for h in stones)
-    min_v = min(min(h.vx, h.vy, h.vz) for h in stones)
-    
-    # For each possible velocity
-    for vx in range(-10, 11):  # Use smaller range for test case
-        print(f"Trying vx={vx}")  # Progress indicator
-        for vy in range(-10, 11):
-            for vz in range(-10, 11):
-                try:
-                    # For first two hailstones at times t1 and t2:
-                    # p + t1*v = h1.p + t1*h1.v
-                    # p + t2*v = h2.p + t2*h2.v
-                    
-                    # Subtracting equations:
-                    # t1*(v - h1.v) = h1.p - p
-                    # t2*(v - h2.v) = h2.p - p
-                    
-                    # From x and y components:
-                    # t1*(vx - h1.vx) = h1.px - px
-                    # t1*(vy - h1.vy) = h1.py - py
-                    # t2*(vx - h2.vx) = h2.px - px
-                    # t2*(vy - h2.vy) = h2.py - py
-                    
-                    # Cross multiply to eliminate t1 and t2:
-                    # (h1.px - px)/(vx - h1.vx) = (h1.py - py)/(vy - h1.vy)
-                    # (h2.px - px)/(vx - h2.vx) = (h2.py - py)/(vy - h2.vy)
-                    
-                    # This gives us:
-                    # (h1.px - px)*(vy - h1.vy) = (h1.py - py)*(vx - h1.vx)
-                    # (h2.px - px)*(vy - h2.vy) = (h2.py - py)*(vx - h2.vx)
-                    
-                    # Solve for px and py:
-                    # Let a1 = vy - h1.vy, b1 = -(vx - h1.vx)
-                    # Let a2 = vy - h2.vy, b2 = -(vx - h2.vx)
-                    # Then:
-                    # a1*px + b1*py = h1.px*a1 + h1.py*b1
-                    # a2*px + b2*py = h2.px*a2 + h2.py*b2
-                    
-                    a1 = vy - h1.vy
-                    b1 = -(vx - h1.vx)
-                    c1 = h1.px*(vy - h1.vy) - h1.py*(vx - h1.vx)
-                    
-                    a2 = vy - h2.vy
-                    b2 = -(vx - h2.vx)
-                    c2 = h2.px*(vy - h2.vy) - h2.py*(vx - h2.vx)
-                    
-                    # Solve using Cramer's rule
-                    det = a1*b2 - a2*b1
-                    if det == 0:
-                        continue
-                    
-                    px = (c1*b2 - c2*b1) // det
-                    py = (a1*c2 - a2*c1) // det
-                    
-                    # Use z equation to find pz
-                    if vx != h1.vx:
-                        t1 = (px - h1.px) // (h1.vx - vx)
-                    elif vy != h1.vy:
-                        t1 = (py - h1.py) // (h1.vy - vy)
-                    else:
-                        continue
-                    
-                    if t1 <= 0:
-                        continue
-                    
-                    pz = h1.pz + t1*h1.vz - t1*vz
-                    
-                    # Verify solution works for third hailstone
-                    if h3.vx != vx:
-                        t3 = (px - h3.px) // (h3.vx - vx)
-                    elif h3.vy != vy:
-                        t3 = (py - h3.py) // (h3.vy - vy)
-                    elif h3.vz != vz:
-                        t3 = (pz - h3.pz) // (h3.vz - vz)
-                    else:
-                        continue
-                    
-                    if t3 <= 0:
-                        continue
-                    
-                    # Check if solution works
-                    if (px + t3*vx == h3.px + t3*h3.vx and
-                        py + t3*vy == h3.py + t3*h3.vy and
-                        pz + t3*vz == h3.pz + t3*h3.vz):
-                        return px + py + pz
-                    
-                except ZeroDivisionError:
-                    continue
+    # Three stones give six independent equations; fall back to other
+    # triples only if the first three are degenerate
+    for h1, h2, h3 in combinations(stones, 3):
+        solution = solve_linear_exact(rock_equations(h1, h2) + rock_equations(h1, h3))
+        if solution is None:
+            continue
+        
+        position, velocity = solution[:3], solution[3:]
+        if all(c.denominator == 1 for c in solution) and all(rock_hits(position, velocity, h) for h in stones):
+            return int(sum(position))
+        return None
     
     return None
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=ENGINES, default="scalar", help="part 1 pair search")
+    args = parser.parse_args()
+    
     # Test with example input
     test_input = """19, 13, 30 @ -2,  1, -2
 18, 19, 22 @ -1, -1, -2
@@ -214,7 +374,7 @@ def main():
 20, 19, 15 @  1, -5, -3"""
     
     print("Testing with example input...")
-    result = solve_part1(test_input, 7, 27)
+    result = solve_part1(test_input, 7, 27, engine=args.engine)
     print(f"Test result part 1: {result}")
     assert result == 2, f"Test failed! Expected 2, got {result}"
     
@@ -225,7 +385,7 @@ def main():
     
     print("\nSolving with real input...")
     data = read_input()
-    result = solve_part1(data, 200000000000000, 400000000000000)
+    result = solve_part1(data, 200000000000000, 400000000000000, engine=args.engine)
     print(f"Part 1: {result}")
     
     result = solve_part2(data)
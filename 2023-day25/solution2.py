@@ -1,46 +1,143 @@
+from array import array
 from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import multiprocessing
 import random
 
+try:
+    import numpy as np
+except ImportError:  # only the spectral method needs NumPy
+    np = None
+
+METHODS = ("flow", "sampling", "spectral")
+
 def read_input(filename="input"):
     with open(filename, "r") as f:
         return f.read().strip()
 
+class CompactGraph:
+    """Undirected graph with vertex names interned to ints and CSR adjacency.
+    
+    The neighbours of vertex v are targets[offsets[v]:offsets[v + 1]], and
+    edge_ids holds the matching integer edge id for each of them, so edge sets
+    can be bytearrays indexed by edge id instead of sets of name tuples.
+    """
+    
+    def __init__(self, names, edges):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.edge_u = array('i', (u for u, _ in edges))
+        self.edge_v = array('i', (v for _, v in edges))
+        
+        degree = [0] * len(names)
+        for u, v in edges:
+            degree[u] += 1
+            degree[v] += 1
+        self.offsets = array('i', [0]) * (len(names) + 1)
+        for v in range(len(names)):
+            self.offsets[v + 1] = self.offsets[v] + degree[v]
+        
+        fill = array('i', self.offsets[:-1])
+        self.targets = array('i', [0]) * (2 * len(edges))
+        self.edge_ids = array('i', [0]) * (2 * len(edges))
+        for edge, (u, v) in enumerate(edges):
+            for a, b in ((u, v), (v, u)):
+                self.targets[fill[a]] = b
+                self.edge_ids[fill[a]] = edge
+                fill[a] += 1
+        
+        # Reusable BFS workspace: a vertex is visited in the current search iff
+        # stamp[v] == epoch, so starting a new search never clears anything
+        self.stamp = array('i', [0]) * len(names)
+        self.parent_edge = array('i', [-1]) * len(names)
+        self.epoch = 0
+    
+    def __len__(self):
+        return len(self.names)
+    
+    @property
+    def num_edges(self):
+        return len(self.edge_u)
+    
+    def next_epoch(self):
+        """Start a new search on the shared BFS workspace"""
+        if self.epoch == 2**31 - 1:
+            self.stamp = array('i', [0]) * len(self.names)
+            self.epoch = 0
+        self.epoch += 1
+        return self.epoch
+    
+    def other_end(self, edge, vertex):
+        return self.edge_u[edge] + self.edge_v[edge] - vertex
+    
+    def trace_path(self, start, end):
+        """Edge ids from start to end, following parent_edge back from end"""
+        path = []
+        vertex = end
+        while vertex != start:
+            edge = self.parent_edge[vertex]
+            path.append(edge)
+            vertex = self.other_end(edge, vertex)
+        path.reverse()
+        return path
+    
+    def edge_names(self, edge):
+        return tuple(sorted([self.names[self.edge_u[edge]], self.names[self.edge_v[edge]]]))
+    
+    def edge_mask(self, edges=()):
+        """Bytearray with 1 for every edge id in edges"""
+        mask = bytearray(self.num_edges)
+        for edge in edges:
+            mask[edge] = 1
+        return mask
+
 def parse_graph(data):
-    """Parse input into adjacency list"""
-    graph = defaultdict(set)
-    edges = set()
+    """Parse input into a CompactGraph"""
+    index = {}
+    edges = {}
     
     for line in data.splitlines():
         source, targets = line.split(": ")
+        for target in [source] + targets.split():
+            index.setdefault(target, len(index))
         for target in targets.split():
-            graph[source].add(target)
-            graph[target].add(source)
-            edges.add(tuple(sorted([source, target])))
+            u, v = index[source], index[target]
+            edges.setdefault((min(u, v), max(u, v)), None)
     
-    return graph, edges
+    return CompactGraph(list(index), list(edges))
 
 def bfs_path(graph, start, end, excluded_edges=None):
-    """Find a path between start and end avoiding excluded edges"""
+    """Find a path between start and end avoiding excluded edges; returns its edge ids
+    
+    Only parent pointers are stored during the search; the path itself is
+    rebuilt once the end is reached.
+    """
     if excluded_edges is None:
-        excluded_edges = set()
+        excluded_edges = bytearray(graph.num_edges)
+    offsets, targets, edge_ids = graph.offsets, graph.targets, graph.edge_ids
+    stamp, parent_edge = graph.stamp, graph.parent_edge
+    epoch = graph.next_epoch()
         
-    queue = deque([(start, [start])])
-    visited = {start}
+    queue = deque([start])
+    stamp[start] = epoch
     
     while queue:
-        vertex, path = queue.popleft()
-        for next_vertex in graph[vertex]:
-            if next_vertex not in visited and tuple(sorted([vertex, next_vertex])) not in excluded_edges:
+        vertex = queue.popleft()
+        for k in range(offsets[vertex], offsets[vertex + 1]):
+            next_vertex, edge = targets[k], edge_ids[k]
+            if stamp[next_vertex] != epoch and not excluded_edges[edge]:
+                stamp[next_vertex] = epoch
+                parent_edge[next_vertex] = edge
                 if next_vertex == end:
-                    return path + [next_vertex]
-                visited.add(next_vertex)
-                queue.append((next_vertex, path + [next_vertex]))
+                    return graph.trace_path(start, end)
+                queue.append(next_vertex)
     return None
 
 def find_all_paths(graph, start, end, max_paths=100):
-    """Find multiple paths between start and end"""
+    """Find multiple edge-disjoint paths between start and end"""
     paths = []
-    excluded_edges = set()
+    excluded_edges = bytearray(graph.num_edges)
     
     for _ in range(max_paths):
         path = bfs_path(graph, start, end, excluded_edges)
@@ -48,69 +145,270 @@ def find_all_paths(graph, start, end, max_paths=100):
             break
             
         paths.append(path)
-        # Add edges from this path to excluded edges to find different paths
-        for i in range(len(path) - 1):
-            excluded_edges.add(tuple(sorted([path[i], path[i + 1]])))
+        # Exclude this path's edges to find different paths
+        for edge in path:
+            excluded_edges[edge] = 1
     
     return paths
 
-def get_edge_frequency(graph):
+def get_edge_frequency(graph, pairs_to_try=None, rng=random):
     """Find how frequently each edge appears in paths between random pairs"""
     edge_count = defaultdict(int)
-    vertices = list(graph.keys())
-    pairs_to_try = min(len(vertices) * 2, 100)  # Limit number of pairs to try
+    vertices = range(len(graph))
+    if pairs_to_try is None:
+        pairs_to_try = min(len(vertices) * 2, 100)  # Limit number of pairs to try
     
     for _ in range(pairs_to_try):
-        start = random.choice(vertices)
-        end = random.choice(vertices)
+        start = rng.choice(vertices)
+        end = rng.choice(vertices)
         if start == end:
             continue
             
         paths = find_all_paths(graph, start, end, max_paths=5)  # Limit paths per pair
         for path in paths:
-            for i in range(len(path) - 1):
-                edge = tuple(sorted([path[i], path[i + 1]]))
+            for edge in path:
                 edge_count[edge] += 1
                 
     return edge_count
 
-def check_partition(graph, cut_edges):
-    """Check if removing these edges creates exactly two components"""
-    if len(cut_edges) != 3:
-        return None
-        
-    # Start from any vertex
-    start = next(iter(graph))
-    visited = {start}
+# Graph for pool workers, set once per process by _init_worker
+_worker_graph = None
+
+def _init_worker(graph):
+    # Under fork the graph is inherited copy-on-write; otherwise it is
+    # pickled once per worker rather than once per batch
+    global _worker_graph
+    _worker_graph = graph
+
+def _sample_batch(task):
+    seed, batch, pairs = task
+    # Each batch gets its own derived seed, so results don't depend on scheduling
+    return get_edge_frequency(_worker_graph, pairs, random.Random(f"{seed}:{batch}"))
+
+def _top_edges(edge_count, n):
+    return [edge for edge, _ in sorted(edge_count.items(), key=lambda x: (-x[1], x[0]))[:n]]
+
+def sample_edge_frequency(graph, workers=1, seed=None, batch_size=25, max_pairs=None):
+    """Sample edge frequencies in seeded batches over a process pool.
+    
+    Batches are run a round (one per worker) at a time and their counts merged.
+    Sampling stops early once the top 3 edges are unchanged from the previous
+    round and check_partition confirms they split the graph.
+    Returns (edge_count, cut) where cut is the confirmed top 3 or None.
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    if max_pairs is None:
+        max_pairs = 2 * len(graph)
+    edge_count = defaultdict(int)
+    previous_top = None
+    
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(workers, mp_context=context,
+                             initializer=_init_worker, initargs=(graph,)) as pool:
+        batch = 0
+        while batch * batch_size < max_pairs:
+            tasks = [(seed, batch + k, batch_size) for k in range(workers)]
+            batch += workers
+            for counts in pool.map(_sample_batch, tasks):
+                for edge, count in counts.items():
+                    edge_count[edge] += count
+            
+            top = _top_edges(edge_count, 3)
+            if top == previous_top and check_partition(graph, top):
+                return edge_count, set(top)
+            previous_top = top
+    
+    return edge_count, None
+
+def _component(graph, start, cut_mask):
+    """Bytearray marking the vertices reachable from start without crossing cut edges"""
+    offsets, targets, edge_ids = graph.offsets, graph.targets, graph.edge_ids
+    visited = bytearray(len(graph))
+    visited[start] = 1
     queue = deque([start])
     
-    # Find first component
     while queue:
         vertex = queue.popleft()
-        for next_vertex in graph[vertex]:
-            edge = tuple(sorted([vertex, next_vertex]))
-            if edge not in cut_edges and next_vertex not in visited:
-                visited.add(next_vertex)
+        for k in range(offsets[vertex], offsets[vertex + 1]):
+            next_vertex = targets[k]
+            if not cut_mask[edge_ids[k]] and not visited[next_vertex]:
+                visited[next_vertex] = 1
                 queue.append(next_vertex)
+    return visited
+
+def check_partition(graph, cut_edges):
+    """Check if removing these edge ids creates exactly two components"""
+    if len(cut_edges) != 3:
+        return None
+        
+    # Find the component of vertex 0
+    size = sum(_component(graph, 0, graph.edge_mask(cut_edges)))
     
     # If we visited all vertices, not a valid cut
-    if len(visited) == len(graph):
+    if size == len(graph):
         return None
         
     # Return size of both components
-    return len(visited) * (len(graph) - len(visited))
+    return size * (len(graph) - size)
 
-def solve_part1(data):
-    graph, edges = parse_graph(data)
+def _augmenting_path(graph, flow, source, sink):
+    """BFS over arcs with spare capacity; True if the sink was reached.
     
-    # Find edges that appear most frequently in paths
-    edge_freq = get_edge_frequency(graph)
+    Parent edges are left in graph.parent_edge, and the vertices reached are
+    those stamped with the current graph.epoch.
+    """
+    offsets, targets, edge_ids, edge_u = graph.offsets, graph.targets, graph.edge_ids, graph.edge_u
+    stamp, parent_edge = graph.stamp, graph.parent_edge
+    epoch = graph.next_epoch()
+    stamp[source] = epoch
+    queue = deque([source])
+    while queue:
+        vertex = queue.popleft()
+        for k in range(offsets[vertex], offsets[vertex + 1]):
+            next_vertex, edge = targets[k], edge_ids[k]
+            # Each undirected edge is a pair of unit-capacity arcs; flow[edge]
+            # is measured from edge_u to edge_v
+            used = flow[edge] if edge_u[edge] == vertex else -flow[edge]
+            if stamp[next_vertex] != epoch and used < 1:
+                stamp[next_vertex] = epoch
+                parent_edge[next_vertex] = edge
+                if next_vertex == sink:
+                    return True
+                queue.append(next_vertex)
+    return False
+
+def min_cut(graph, cut_size=3):
+    """Find a cut of exactly cut_size edges with Edmonds-Karp from a fixed source.
+    
+    For each sink at most cut_size + 1 augmenting paths are needed: the flow
+    stops at cut_size only when the sink is across the cut, and the vertices
+    still reachable in the residual graph form one side.
+    Returns (cut_edge_ids, size_a, size_b), or None if there is no such cut.
+    """
+    source = 0
+    
+    for sink in range(1, len(graph)):
+        flow = array('i', [0]) * graph.num_edges
+        for _ in range(cut_size + 1):
+            if not _augmenting_path(graph, flow, source, sink):
+                break
+            # Push one unit along the path, walking it from the source
+            vertex = source
+            for edge in graph.trace_path(source, sink):
+                flow[edge] += 1 if graph.edge_u[edge] == vertex else -1
+                vertex = graph.other_end(edge, vertex)
+        else:
+            continue  # more than cut_size paths: same side as the source
+        
+        side = [stamp == graph.epoch for stamp in graph.stamp]
+        cut_edges = [edge for edge in range(graph.num_edges)
+                     if side[graph.edge_u[edge]] != side[graph.edge_v[edge]]]
+        if len(cut_edges) == cut_size:
+            size = sum(side)
+            return set(cut_edges), size, len(graph) - size
+    
+    return None
+
+def fiedler_vector(graph, steps=100, seed=0):
+    """Approximate the Laplacian's second eigenvector with Lanczos iteration.
+    
+    The Laplacian is applied straight from the CSR arrays. The Krylov basis is
+    kept orthogonal to the constant vector (the first eigenvector) and fully
+    reorthogonalized, so the smallest Ritz value approximates the Fiedler value.
+    """
+    if np is None:
+        raise ImportError("the spectral method needs NumPy installed")
+    n = len(graph)
+    targets = np.frombuffer(graph.targets, dtype=np.int32)
+    degree = np.diff(np.frombuffer(graph.offsets, dtype=np.int32)).astype(np.float64)
+    rows = np.repeat(np.arange(n), degree.astype(np.int64))
+    
+    def laplacian(x):
+        return degree * x - np.bincount(rows, weights=x[targets], minlength=n)
+    
+    steps = max(1, min(steps, n - 1))
+    basis = np.zeros((steps, n))
+    alpha, beta = [], []
+    q = np.random.default_rng(seed).standard_normal(n)
+    q -= q.mean()
+    q /= np.linalg.norm(q)
+    for k in range(steps):
+        basis[k] = q
+        w = laplacian(q)
+        alpha.append(q @ w)
+        # Full reorthogonalization against the basis and the constant vector,
+        # done twice so rounding never lets the constant vector leak back in
+        for _ in range(2):
+            w -= w.mean()
+            w -= basis[:k + 1].T @ (basis[:k + 1] @ w)
+        norm = np.linalg.norm(w)
+        if k == steps - 1 or norm < 1e-10:
+            break
+        beta.append(norm)
+        q = w / norm
+    
+    size = len(alpha)
+    tridiagonal = np.diag(alpha) + np.diag(beta[:size - 1], 1) + np.diag(beta[:size - 1], -1)
+    _, vectors = np.linalg.eigh(tridiagonal)
+    return basis[:size].T @ vectors[:, 0]
+
+def spectral_cut(graph, cut_size=3):
+    """Split vertices by the sign of the Fiedler vector.
+    
+    Returns (cut_edge_ids, size_a, size_b) if exactly cut_size edges cross the
+    split and removing them leaves each sign side as one connected component,
+    otherwise None.
+    """
+    side = fiedler_vector(graph) >= 0
+    crossing = side[np.frombuffer(graph.edge_u, dtype=np.int32)] != side[np.frombuffer(graph.edge_v, dtype=np.int32)]
+    cut_edges = np.flatnonzero(crossing).tolist()
+    if len(cut_edges) != cut_size:
+        return None
+    
+    # Both sides must be reachable from one of their own vertices
+    cut_mask = graph.edge_mask(cut_edges)
+    size = int(side.sum())
+    sizes = []
+    for on_side, expected in ((True, size), (False, len(graph) - size)):
+        if expected == 0:
+            return None
+        start = int(np.flatnonzero(side == on_side)[0])
+        if sum(_component(graph, start, cut_mask)) != expected:
+            return None
+        sizes.append(expected)
+    return set(cut_edges), sizes[0], sizes[1]
+
+def find_cut(graph, method="flow", workers=1, seed=None):
+    """Find the 3-edge cut with the chosen method.
+    
+    Returns (cut_edge_ids, product of the two group sizes), or None.
+    """
+    if method == "spectral":
+        cut = spectral_cut(graph)
+        if cut is not None:
+            cut_edges, size_a, size_b = cut
+            return cut_edges, size_a * size_b
+        method = "flow"  # fall back to the exact engine
     
-    # Sort edges by frequency, highest first
-    sorted_edges = sorted(edge_freq.items(), key=lambda x: (-x[1], x[0]))
+    if method == "flow":
+        cut = min_cut(graph)
+        if cut is None:
+            return None
+        cut_edges, size_a, size_b = cut
+        return cut_edges, size_a * size_b
+    
+    # Find edges that appear most frequently in paths
+    if workers > 1 or seed is not None:
+        edge_freq, cut = sample_edge_frequency(graph, workers, seed)
+        if cut:
+            return cut, check_partition(graph, cut)
+    else:
+        edge_freq = get_edge_frequency(graph)
     
     # Try combinations of the most frequent edges
-    top_edges = [edge for edge, _ in sorted_edges[:10]]  # Only try top 10 most frequent edges
+    top_edges = _top_edges(edge_freq, 10)  # Only try top 10 most frequent edges
     
     for i in range(len(top_edges)-2):
         for j in range(i+1, len(top_edges)-1):
@@ -118,11 +416,21 @@ def solve_part1(data):
                 cut = {top_edges[i], top_edges[j], top_edges[k]}
                 result = check_partition(graph, cut)
                 if result:
-                    return result
+                    return cut, result
     
     return None
 
+def solve_part1(data, method="flow", workers=1, seed=None):
+    cut = find_cut(parse_graph(data), method, workers, seed)
+    return cut[1] if cut else None
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--method", choices=METHODS, default="flow")
+    parser.add_argument("--workers", type=int, default=1, help="sampling processes (--method sampling)")
+    parser.add_argument("--seed", type=int, help="seed for reproducible sampling (--method sampling)")
+    args = parser.parse_args()
+    
     # Test with example input
     test_input = """jqt: rhn xhk nvd
 rsh: frs pzl lsr
@@ -139,15 +447,21 @@ rzs: qnr cmg lsr rsh
 frs: qnr lhk lsr"""
     
     print("Testing with example input...")
-    result = solve_part1(test_input)
+    result = solve_part1(test_input, args.method, args.workers, args.seed)
     print(f"Test result: {result}")
     assert result == 54, f"Test failed! Expected 54, got {result}"
     print("Test passed!")
     
     print("\nSolving with real input...")
-    data = read_input()
-    result = solve_part1(data)
+    graph = parse_graph(read_input())
+    cut = find_cut(graph, args.method, args.workers, args.seed)
+    if cut is None:
+        print("Part 1: None")
+        return
+    cut_edges, result = cut
     print(f"Part 1: {result}")
+    edges = sorted(graph.edge_names(edge) for edge in cut_edges)
+    print("Cut edges: " + ", ".join(f"{a}/{b}" for a, b in edges))
 
 if __name__ == "__main__":
     main()
@@ -1,20 +1,65 @@
-def read_input(filename="input"):
-    with open(filename, "r") as f:
-        lines = [line.strip() for line in f.readlines()]
+import argparse
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python engine works without NumPy
+    np = None
+
+ENGINES = ("python", "numpy")
+
+
+def read_input(filename="input", chunk_size=1 << 20):
+    """Stream the two location-ID columns into compact int64 arrays.
+
+    The file is read in fixed-size byte chunks and split on whitespace, so no
+    per-line strings are kept around and memory stays near 16 bytes per row.
+    """
+    left_list = array('q')
+    right_list = array('q')
+    carry = b""
     
-    left_list = []
-    right_list = []
+    with open(filename, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            chunk = carry + chunk
+            # Keep a trailing partial number for the next chunk
+            cut = max(chunk.rfind(b"\n"), chunk.rfind(b" "), chunk.rfind(b"\t"), chunk.rfind(b"\r"))
+            if cut < 0:
+                carry = chunk
+                continue
+            carry = chunk[cut + 1:]
+            _extend_pairs(left_list, right_list, chunk[:cut + 1].split())
     
-    for line in lines:
-        if not line:  # skip empty lines
-            continue
-        left, right = line.split()
-        left_list.append(int(left))
-        right_list.append(int(right))
+    _extend_pairs(left_list, right_list, carry.split())
+    if len(left_list) != len(right_list):
+        raise ValueError(f"{filename}: expected pairs of location IDs, got an odd number of values")
     
     return left_list, right_list
 
-def calculate_total_distance(left_list, right_list, debug=False):
+def _extend_pairs(left_list, right_list, tokens):
+    # Tokens alternate left/right; a chunk may end between the two columns
+    if not tokens:
+        return
+    if len(left_list) > len(right_list):
+        right_list.append(int(tokens[0]))
+        tokens = tokens[1:]
+    left_list.extend(map(int, tokens[0::2]))
+    right_list.extend(map(int, tokens[1::2]))
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("the numpy engine needs NumPy installed; use engine='python' instead")
+
+def calculate_total_distance(left_list, right_list, debug=False, engine="python"):
+    if engine == "numpy":
+        return _total_distance_numpy(left_list, right_list)
+    
     # Sort both lists
     left_sorted = sorted(left_list)
     right_sorted = sorted(right_list)
@@ -33,7 +78,16 @@ def calculate_total_distance(left_list, right_list, debug=False):
     
     return total_distance
 
-def calculate_similarity_score(left_list, right_list, debug=False):
+def _total_distance_numpy(left_list, right_list):
+    _require_numpy()
+    left_sorted = np.sort(np.asarray(left_list, dtype=np.int64))
+    right_sorted = np.sort(np.asarray(right_list, dtype=np.int64))
+    return int(np.abs(left_sorted - right_sorted).sum())
+
+def calculate_similarity_score(left_list, right_list, debug=False, engine="python"):
+    if engine == "numpy":
+        return _similarity_score_numpy(left_list, right_list)
+    
     # Count occurrences in right list
     right_counts = {}
     for num in right_list:
@@ -50,7 +104,100 @@ def calculate_similarity_score(left_list, right_list, debug=False):
     
     return total_score
 
+def _similarity_score_numpy(left_list, right_list):
+    _require_numpy()
+    left = np.asarray(left_list, dtype=np.int64)
+    values, counts = np.unique(np.asarray(right_list, dtype=np.int64), return_counts=True)
+    if len(values) == 0:
+        return 0
+    
+    # Look up each left number in the sorted table of right-list values
+    idx = np.searchsorted(values, left)
+    idx[idx == len(values)] = 0
+    matched = values[idx] == left
+    return int((left[matched] * counts[idx[matched]]).sum())
+
+class LocationIndex:
+    """Keeps both day1 scores current as location pairs are appended.
+    
+    Similarity uses the same right_counts idea as calculate_similarity_score,
+    plus left_counts so a new right value can credit every matching left value.
+    Distance keeps both lists sorted; inserting a pair only re-pairs the ranks
+    between the two insertion points.
+    
+    Reading either score is O(1). The initial rows are indexed in bulk in
+    O(n log n); each add is O(|i - j|) for insertion ranks i and j, which is
+    O(n) in the worst case (about n/3 on random data).
+    """
+    
+    def __init__(self, left_list=(), right_list=()):
+        self.left_sorted = sorted(left_list)
+        self.right_sorted = sorted(right_list)
+        if len(self.left_sorted) != len(self.right_sorted):
+            raise ValueError("left and right lists must have the same length")
+        self.left_counts = Counter(self.left_sorted)
+        self.right_counts = Counter(self.right_sorted)
+        self.total_distance = self._distance_between(0, len(self.left_sorted))
+        self.similarity_score = sum(num * count * self.right_counts[num]
+                                    for num, count in self.left_counts.items() if num in self.right_counts)
+    
+    def __len__(self):
+        return len(self.left_sorted)
+    
+    def add(self, left, right):
+        # Similarity: the new left number matches every existing right copy,
+        # and the new right number adds one more copy for every left match
+        self.similarity_score += left * self.right_counts.get(left, 0)
+        self.left_counts[left] = self.left_counts.get(left, 0) + 1
+        self.similarity_score += right * self.left_counts.get(right, 0)
+        self.right_counts[right] = self.right_counts.get(right, 0) + 1
+        
+        # Distance: ranks below lo and above hi keep their partner
+        i = bisect_right(self.left_sorted, left)
+        j = bisect_right(self.right_sorted, right)
+        lo, hi = min(i, j), max(i, j)
+        self.total_distance -= self._distance_between(lo, hi)
+        self.left_sorted.insert(i, left)
+        self.right_sorted.insert(j, right)
+        self.total_distance += self._distance_between(lo, hi + 1)
+    
+    def _distance_between(self, lo, hi):
+        return sum(abs(l - r) for l, r in zip(self.left_sorted[lo:hi], self.right_sorted[lo:hi]))
+
+def benchmark(sizes=(10**6, 10**8), python_limit=10**7):
+    """Time both engines on random location IDs, checking they agree."""
+    _require_numpy()
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        left = rng.integers(10000, 100000, size=n, dtype=np.int64)
+        right = rng.integers(10000, 100000, size=n, dtype=np.int64)
+        print(f"{n:,} rows:")
+        
+        start = time.perf_counter()
+        result1 = calculate_total_distance(left, right, engine="numpy")
+        result2 = calculate_similarity_score(left, right, engine="numpy")
+        print(f"  numpy:  {time.perf_counter() - start:.3f}s")
+        
+        # The pure-Python path needs boxed ints, so skip it on the huge sizes
+        if n > python_limit:
+            print("  python: skipped")
+            continue
+        left_buf, right_buf = array('q', left.tobytes()), array('q', right.tobytes())
+        start = time.perf_counter()
+        assert calculate_total_distance(left_buf, right_buf) == result1
+        assert calculate_similarity_score(left_buf, right_buf) == result2
+        print(f"  python: {time.perf_counter() - start:.3f}s")
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=ENGINES, default="python")
+    parser.add_argument("--bench", action="store_true", help="compare engine speed and exit")
+    args = parser.parse_args()
+    
+    if args.bench:
+        benchmark()
+        return
+    
     # Test with example input first
     print("Testing with example input:")
     left_list, right_list = read_input("test_input")
@@ -68,9 +215,9 @@ def main():
     # Now solve with real input
     print("Solving with real input:")
     left_list, right_list = read_input("input")
-    result1 = calculate_total_distance(left_list, right_list)
+    result1 = calculate_total_distance(left_list, right_list, engine=args.engine)
     print(f"Part 1: The total distance between the lists is: {result1}")
-    result2 = calculate_similarity_score(left_list, right_list)
+    result2 = calculate_similarity_score(left_list, right_list, engine=args.engine)
     print(f"Part 2: The similarity score is: {result2}")
 
 if __name__ == "__main__":
@@ -1,7 +1,57 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python engine works without NumPy
+    np = None
+
+ENGINES = ("python", "numpy")
+
 def read_input(filename="input"):
     with open(filename, "r") as f:
         return [list(map(int, line.strip().split())) for line in f.readlines()]
 
+def _require_numpy():
+    if np is None:
+        raise ImportError("the numpy engine needs NumPy installed; use engine='python' instead")
+
+def read_input_ragged(filename="input"):
+    """Parse reports into a flat values array plus row offsets.
+    
+    Report r is values[offsets[r]:offsets[r+1]]. Every line is a report, like
+    read_input, and levels are non-negative integers.
+    """
+    _require_numpy()
+    with open(filename, "rb") as f:
+        buf = np.frombuffer(f.read(), dtype=np.uint8)
+    
+    # Locate runs of digits without splitting the text into lines
+    is_digit = (buf >= ord("0")) & (buf <= ord("9"))
+    padded = np.zeros(len(buf) + 2, dtype=bool)
+    padded[1:-1] = is_digit
+    starts = np.flatnonzero(padded[1:] & ~padded[:-1])
+    ends = np.flatnonzero(padded[:-1] & ~padded[1:])
+    
+    # Horner's rule, one digit column at a time: numbers are only a few digits
+    # long, so this loops a handful of times over the number starts
+    lengths = ends - starts
+    values = buf[starts].astype(np.int64) - ord("0")
+    for k in range(1, int(lengths.max()) if len(starts) else 0):
+        longer = np.flatnonzero(lengths > k)
+        values[longer] = values[longer] * 10 + (buf[starts[longer] + k] - ord("0"))
+    
+    newlines = np.flatnonzero(buf == ord("\n"))
+    # A report ends at its newline; one search per line rather than per value
+    offsets = np.concatenate(([0], np.searchsorted(starts, newlines)))
+    if len(buf) and buf[-1] != ord("\n"):
+        offsets = np.append(offsets, len(starts))
+    
+    return values, offsets
+
 def is_safe_report(levels):
     if len(levels) < 2:
         return True
@@ -27,7 +77,48 @@ def is_safe_report(levels):
     
     return True
 
+def _is_safe_step(a, b, increasing):
+    diff = b - a
+    return 1 <= diff <= 3 if increasing else -3 <= diff <= -1
+
+def _removable_level(levels, increasing):
+    """Smallest index whose removal makes levels safe in one direction.
+    
+    Returns -1 if already safe and None if no single removal helps.
+    """
+    n = len(levels)
+    first_bad = last_bad = None
+    for i in range(1, n):
+        if not _is_safe_step(levels[i-1], levels[i], increasing):
+            if first_bad is None:
+                first_bad = i
+            last_bad = i
+    
+    if first_bad is None:
+        return -1
+    
+    # Removing level i drops steps i and i+1 and bridges levels[i-1] -> levels[i+1],
+    # so every bad step must be one of those two and the bridge must be safe
+    for i in (first_bad - 1, first_bad):
+        if last_bad > i + 1:
+            continue
+        if i == 0 or i == n - 1 or _is_safe_step(levels[i-1], levels[i+1], increasing):
+            return i
+    return None
+
 def is_safe_with_dampener(levels):
+    # Single pass per direction over the steps, no copies of the report
+    candidates = [_removable_level(levels, increasing) for increasing in (True, False)]
+    if -1 in candidates:
+        return True, None
+    
+    candidates = [i for i in candidates if i is not None]
+    if candidates:
+        return True, min(candidates)
+    return False, None
+
+def is_safe_with_dampener_bruteforce(levels):
+    """Reference O(n^2) version that retries the report without each level."""
     # First check if it's safe without removing any level
     if is_safe_report(levels):
         return True, None
@@ -47,7 +138,129 @@ def count_safe_reports(reports, use_dampener=False):
     else:
         return sum(1 for report in reports if is_safe_with_dampener(report)[0])
 
+def shard_offsets(filename, num_shards):
+    """Split a file into up to num_shards newline-aligned (start, end) byte ranges."""
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, "rb") as f:
+        for k in range(1, num_shards):
+            f.seek(max(size * k // num_shards, bounds[-1]))
+            f.readline()  # move past the line we landed in
+            pos = min(f.tell(), size)
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    if size > bounds[-1]:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+def _count_shard(shard):
+    # Workers read their own byte range so only offsets and counts cross processes
+    filename, start, end = shard
+    with open(filename, "rb") as f:
+        f.seek(start)
+        lines = f.read(end - start).decode().splitlines()
+    reports = [list(map(int, line.split())) for line in lines]
+    return count_safe_reports(reports), count_safe_reports(reports, use_dampener=True)
+
+def count_safe_reports_parallel(filename="input", workers=None):
+    """Score both parts over newline-aligned shards of the file in a process pool."""
+    workers = workers or os.cpu_count()
+    shards = [(filename, start, end) for start, end in shard_offsets(filename, workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        counts = list(pool.map(_count_shard, shards))
+    return sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+def _safe_steps(diffs, increasing):
+    if increasing:
+        return (diffs >= 1) & (diffs <= 3)
+    return (diffs >= -3) & (diffs <= -1)
+
+def count_safe_reports_batched(values, offsets):
+    """Count (part 1, part 2) safe reports for a whole ragged batch at once.
+    
+    Uses the same rule as is_safe_with_dampener: in each direction only the
+    two levels around the first bad step can be removed.
+    """
+    _require_numpy()
+    values = np.asarray(values, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    num_reports = len(offsets) - 1
+    report_of_value = np.repeat(np.arange(num_reports), np.diff(offsets))
+    
+    # diffs[g] is values[g+1] - values[g]; those spanning two reports are ignored
+    diffs = np.diff(values)
+    report_of_diff = report_of_value[:-1]
+    in_report = report_of_diff == report_of_value[1:]
+    last_value = len(values) - 1
+    
+    safe = np.zeros(num_reports, dtype=bool)
+    dampened = np.zeros(num_reports, dtype=bool)
+    for increasing in (True, False):
+        bad = np.flatnonzero(in_report & ~_safe_steps(diffs, increasing))
+        if len(bad) == 0:
+            safe[:] = True
+            continue
+        
+        # bad is sorted, so each report's bad steps form one run
+        bad_of = report_of_diff[bad]
+        first_pos = np.flatnonzero(np.concatenate(([True], bad_of[1:] != bad_of[:-1])))
+        bad_reports = bad_of[first_pos]
+        clean = np.ones(num_reports, dtype=bool)
+        clean[bad_reports] = False
+        safe |= clean
+        
+        first = bad[first_pos]
+        last = bad[np.append(first_pos[1:], len(bad)) - 1]
+        report_start = offsets[bad_reports]
+        report_end = offsets[bad_reports + 1] - 1
+        
+        # Remove the level before the first bad step: bridge first-1 -> first+1
+        bridge = values[first + 1] - values[np.maximum(first - 1, 0)]
+        fix_before = (last == first) & ((first == report_start) | _safe_steps(bridge, increasing))
+        
+        # Remove the level after it: bridge first -> first+2
+        bridge = values[np.minimum(first + 2, last_value)] - values[first]
+        fix_after = (last <= first + 1) & ((first + 1 == report_end) | _safe_steps(bridge, increasing))
+        
+        dampened[bad_reports[fix_before | fix_after]] = True
+    
+    return int(safe.sum()), int((safe | dampened).sum())
+
+def benchmark(sizes=(10, 1000, 100000), repeats=3, bruteforce_limit=10**4):
+    """Compare the single-pass dampener against the brute-force version."""
+    rng = random.Random(0)
+    for n in sizes:
+        # A long increasing report with one bad level in the middle: the
+        # brute-force version has to try every earlier index first
+        report = [rng.randint(1, 3) for _ in range(n)]
+        for i in range(1, n):
+            report[i] += report[i-1]
+        report[n // 2] += 10
+        reports = [report] * repeats
+        
+        start = time.perf_counter()
+        results = [is_safe_with_dampener(r) for r in reports]
+        line = f"{n:>7} levels: single pass {(time.perf_counter() - start) / repeats:.6f}s"
+        
+        # Quadratic, so past the limit it would run for minutes per report
+        if n > bruteforce_limit:
+            print(f"{line}, brute force skipped")
+            continue
+        start = time.perf_counter()
+        assert results == [is_safe_with_dampener_bruteforce(r) for r in reports]
+        print(f"{line}, brute force {(time.perf_counter() - start) / repeats:.6f}s")
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=ENGINES, default="python")
+    parser.add_argument("--workers", type=int, default=1, help="score the input in N parallel shards")
+    parser.add_argument("--bench", action="store_true", help="benchmark the dampener check and exit")
+    args = parser.parse_args()
+    
+    if args.bench:
+        benchmark()
+        return
+    
     # Test with example input first
     print("Testing with example input:")
     test_input = """7 6 4 2 1
@@ -97,10 +310,15 @@ def main():
     
     # Now solve with real input
     print("Solving with real input:")
-    reports = read_input("input")
-    result1 = count_safe_reports(reports)
+    if args.workers > 1:
+        result1, result2 = count_safe_reports_parallel("input", args.workers)
+    elif args.engine == "numpy":
+        result1, result2 = count_safe_reports_batched(*read_input_ragged("input"))
+    else:
+        reports = read_input("input")
+        result1 = count_safe_reports(reports)
+        result2 = count_safe_reports(reports, use_dampener=True)
     print(f"Part 1: Number of safe reports: {result1}")
-    result2 = count_safe_reports(reports, use_dampener=True)
     print(f"Part 2: Number of safe reports with Problem Dampener: {result2}")
 
 if __name__ == "__main__":
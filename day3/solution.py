@@ -1,59 +1,156 @@
+import argparse
+import mmap
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 
 def read_input(filename="input"):
     with open(filename, "r") as f:
         return f.read().strip()
 
-def find_multiplications(memory, handle_conditionals=False):
-    # Pattern for valid mul(X,Y) where X and Y are 1-3 digit numbers
-    mul_pattern = r'mul\((\d{1,3}),(\d{1,3})\)'
-    do_pattern = r'do\(\)'
-    dont_pattern = r'don\'t\(\)'
+MUL_PATTERN = re.compile(r"mul\((\d{1,3}),(\d{1,3})\)")
+
+# Longest instruction is mul(123,456)
+MAX_TOKEN_LEN = 12
+
+def enabled_sections(memory, handle_conditionals=False):
+    """Yield the stretches of memory in which multiplications are enabled.
     
-    # Find all instructions with their positions
-    instructions = []
+    No instruction can overlap another, so splitting on don't() and then on the
+    first do() after it finds the same state changes as a full token scan.
+    """
+    if not handle_conditionals:
+        yield memory
+        return
+    first, *rest = memory.split("don't()")
+    yield first
+    for section in rest:
+        _, found, enabled = section.partition("do()")
+        if found:
+            yield enabled
+
+def sum_multiplications(memory, handle_conditionals=False):
+    return sum(int(x) * int(y)
+               for section in enabled_sections(memory, handle_conditionals)
+               for x, y in MUL_PATTERN.findall(section))
+
+def find_multiplications(memory, handle_conditionals=False):
+    results = []
+    for section in enabled_sections(memory, handle_conditionals):
+        for x, y in MUL_PATTERN.findall(section):
+            x, y = int(x), int(y)
+            results.append((x, y, x * y))
+    return results
+
+# For byte chunks one alternation covers every instruction, so a single scan
+# yields them in order: group 1/2 are the mul operands, group 3 is do() and
+# group 4 is don't()
+INSTRUCTION_PATTERN_BYTES = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|(do\(\))|(don't\(\))")
+
+def scan_chunk(data, enabled=True, handle_conditionals=False):
+    """Sum the enabled multiplications in a bytes chunk.
     
-    # Find multiplications
-    for match in re.finditer(mul_pattern, memory):
-        if match.group() == f"mul({match.group(1)},{match.group(2)})":  # Ensure exact match format
-            instructions.append(('mul', match.start(), match.groups()))
+    Returns (total, enabled, last_end) where last_end is the end offset of the
+    last instruction found.
+    """
+    total = 0
+    last_end = 0
+    for match in INSTRUCTION_PATTERN_BYTES.finditer(data):
+        x, y, do, _ = match.groups()
+        if x:
+            if enabled:
+                total += int(x) * int(y)
+        elif handle_conditionals:
+            enabled = do is not None
+        last_end = match.end()
+    return total, enabled, last_end
+
+def stream_sums(filename="input", handle_conditionals=False, chunk_size=1 << 20):
+    """Yield the running sum after each chunk of a memory-mapped dump.
     
-    if handle_conditionals:
-        # Find do() instructions
-        for match in re.finditer(do_pattern, memory):
-            instructions.append(('do', match.start(), None))
-        
-        # Find don't() instructions
-        for match in re.finditer(dont_pattern, memory):
-            instructions.append(('dont', match.start(), None))
-        
-        # Sort instructions by position
-        instructions.sort(key=lambda x: x[1])
+    The enabled flag and the tail of each chunk (which may hold the start of an
+    instruction cut by the chunk boundary) carry over to the next chunk.
+    """
+    total = 0
+    enabled = True
+    with open(filename, "rb") as f:
+        if f.seek(0, 2) == 0:  # mmap can't map an empty file
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+            carry = b""
+            for start in range(0, len(memory), chunk_size):
+                data = carry + memory[start:start + chunk_size]
+                chunk_total, enabled, last_end = scan_chunk(data, enabled, handle_conditionals)
+                total += chunk_total
+                
+                # Anything that starts in the last MAX_TOKEN_LEN - 1 bytes could be cut
+                carry = data[max(last_end, len(data) - (MAX_TOKEN_LEN - 1)):]
+                yield total
+
+def solve_file(filename="input", handle_conditionals=False, chunk_size=1 << 20):
+    total = 0
+    for total in stream_sums(filename, handle_conditionals, chunk_size):
+        pass
+    return total
+
+def summarize_chunk(shard):
+    """Summarize the instructions starting in one byte range of a dump.
     
-    results = []
-    enabled = True  # Multiplications start enabled
+    Returns (all_total, total_if_enabled, total_if_disabled, final_state) where
+    final_state is None when the chunk has no do()/don't() to set it.
+    """
+    filename, start, end = shard
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+            # Read past the end so an instruction starting here is never cut off
+            stop = min(end + MAX_TOKEN_LEN, len(memory))
+            all_total = leading = rest = 0
+            state = None
+            for match in INSTRUCTION_PATTERN_BYTES.finditer(memory, start, stop):
+                if match.start() >= end:
+                    break  # owned by the next chunk
+                x, y, do, _ = match.groups()
+                if not x:
+                    state = do is not None
+                    continue
+                product = int(x) * int(y)
+                all_total += product
+                if state is None:
+                    leading += product
+                elif state:
+                    rest += product
     
-    for inst_type, _, args in instructions:
-        if inst_type == 'mul':
-            x, y = map(int, args)
-            if not handle_conditionals or enabled:
-                results.append((x, y, x * y))
-        elif inst_type == 'do':
-            enabled = True
-        elif inst_type == 'dont':
-            enabled = False
+    # Products before the first do()/don't() depend on the incoming state
+    return all_total, leading + rest, rest, state
+
+def solve_file_parallel(filename="input", workers=None, chunk_size=1 << 24):
+    """Solve both parts by summarizing chunks in a process pool and folding them in order."""
+    size = os.path.getsize(filename)
+    shards = [(filename, start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        summaries = list(pool.map(summarize_chunk, shards))
     
-    return results
+    part1 = part2 = 0
+    enabled = True
+    for all_total, if_enabled, if_disabled, state in summaries:
+        part1 += all_total
+        part2 += if_enabled if enabled else if_disabled
+        if state is not None:
+            enabled = state
+    return part1, part2
 
 def solve_part1(memory):
-    multiplications = find_multiplications(memory)
-    return sum(result for _, _, result in multiplications)
+    return sum_multiplications(memory)
 
 def solve_part2(memory):
-    multiplications = find_multiplications(memory, handle_conditionals=True)
-    return sum(result for _, _, result in multiplications)
+    return sum_multiplications(memory, handle_conditionals=True)
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1, help="summarize chunks of the input in N processes")
+    parser.add_argument("--stream", action="store_true", help="scan the input through mmap in constant memory")
+    args = parser.parse_args()
+    
     # Test with example input first
     print("Testing with example input:")
     test_input = "xmul(2,4)&mul[3,7]!^don't()_mul(5,5)+mul(32,64](mul(11,8)do()?mul(8,5))"
@@ -90,10 +187,16 @@ def main():
     
     # Now solve with real input
     print("Solving with real input:")
-    memory = read_input("input")
-    result1 = solve_part1(memory)
+    if args.workers > 1:
+        result1, result2 = solve_file_parallel("input", args.workers)
+    elif args.stream:
+        result1 = solve_file("input")
+        result2 = solve_file("input", handle_conditionals=True)
+    else:
+        memory = read_input("input")
+        result1 = solve_part1(memory)
+        result2 = solve_part2(memory)
     print(f"Part 1: Sum of all multiplication results: {result1}")
-    result2 = solve_part2(memory)
     print(f"Part 2: Sum of enabled multiplication results: {result2}")
 
 if __name__ == "__main__":
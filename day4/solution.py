@@ -1,8 +1,41 @@
+import argparse
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python engine works without NumPy
+    np = None
+
+ENGINES = ("python", "numpy")
+
+
 def read_input():
     with open("input", "r") as f:
         return [line.strip() for line in f.readlines()]
 
 
+def _require_numpy():
+    if np is None:
+        raise ImportError("the numpy engine needs NumPy installed; use engine='python' instead")
+
+
+def to_grid_array(grid):
+    """Convert a list of equal-length rows into a 2-D uint8 array."""
+    _require_numpy()
+    if isinstance(grid, np.ndarray):
+        return grid
+    rows = [row for row in grid if row]
+    return np.frombuffer("".join(rows).encode(), dtype=np.uint8).reshape(len(rows), -1)
+
+
+def read_grid_array(filename="input"):
+    with open(filename, "r") as f:
+        return to_grid_array([line.strip() for line in f])
+
+
 def find_xmas(grid):
     rows = len(grid)
     cols = len(grid[0])
@@ -54,11 +87,210 @@ def find_xmas_part2(grid):
     return count
 
 
+def find_xmas_numpy(grid, first_row=0, last_row=None):
+    """Vectorized find_xmas: one AND chain of shifted-slice masks per direction.
+
+    Only matches whose topmost letter is in rows [first_row, last_row) count.
+    """
+    g = to_grid_array(grid)
+    rows, cols = g.shape
+    last_row = rows if last_row is None else last_row
+    count = 0
+
+    # Reading SAMX forwards is XMAS backwards, so four directions cover all eight
+    for word in (b"XMAS", b"SAMX"):
+        for dx, dy in [(0, 1), (1, 1), (1, 0), (1, -1)]:
+            span_x, span_y = 3 * dx, 3 * abs(dy)
+            end_row = min(last_row, rows - span_x)
+            if end_row <= first_row or cols <= span_y:
+                continue
+            first_col = span_y if dy < 0 else 0
+            mask = None
+            for i, letter in enumerate(word):
+                r, c = i * dx, first_col + i * dy
+                hit = g[first_row + r:end_row + r, c:c + cols - span_y] == letter
+                mask = hit if mask is None else mask & hit
+            count += int(mask.sum())
+
+    return count
+
+
+def find_xmas_part2_numpy(grid, first_row=0, last_row=None):
+    """Vectorized find_xmas_part2 using the four diagonal neighbour slices.
+
+    Only X-MAS shapes centred in rows [first_row, last_row) count.
+    """
+    g = to_grid_array(grid)
+    rows, cols = g.shape
+    top = max(first_row, 1)
+    bottom = min(rows if last_row is None else last_row, rows - 1)
+    if bottom <= top or cols < 3:
+        return 0
+    m, s = ord("M"), ord("S")
+
+    def ms_pair(a, b):
+        return ((a == m) & (b == s)) | ((a == s) & (b == m))
+
+    above, below = g[top - 1:bottom - 1], g[top + 1:bottom + 1]
+    centers = g[top:bottom, 1:-1] == ord("A")
+    diag1 = ms_pair(above[:, :-2], below[:, 2:])   # top-left to bottom-right
+    diag2 = ms_pair(above[:, 2:], below[:, :-2])   # top-right to bottom-left
+    return int((centers & diag1 & diag2).sum())
+
+
+def grid_file_shape(filename):
+    """Return (rows, width) of a grid file made of fixed-width newline-terminated rows."""
+    size = os.path.getsize(filename)
+    with open(filename, "rb") as f:
+        width = len(f.readline().rstrip(b"\n"))
+    if width == 0:
+        return 0, 0
+    return (size + 1) // (width + 1), width
+
+
+def _count_band(band):
+    """Count both parts for rows [first_row, last_row) of a memory-mapped grid.
+
+    The band is loaded with one row of halo above and three below, so shapes
+    crossing the band edge are seen but only counted by the band they start in.
+    """
+    filename, rows, width, first_row, last_row = band
+    top = max(first_row - 1, 0)
+    bottom = min(last_row + 3, rows)
+    stride = width + 1
+
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+            data = memory[top * stride:bottom * stride]
+    data += b"\n" * ((bottom - top) * stride - len(data))  # last row may lack a newline
+    g = np.frombuffer(data, dtype=np.uint8).reshape(bottom - top, stride)[:, :width]
+
+    return (find_xmas_numpy(g, first_row - top, last_row - top),
+            find_xmas_part2_numpy(g, first_row - top, last_row - top))
+
+
+def count_xmas_tiled(filename="input", band_rows=1024, workers=None):
+    """Solve both parts over row bands of a memory-mapped grid file.
+
+    Memory stays bounded by the band size; with workers > 1 the bands are
+    spread over a process pool.
+    """
+    _require_numpy()
+    rows, width = grid_file_shape(filename)
+    bands = [(filename, rows, width, r, min(r + band_rows, rows)) for r in range(0, rows, band_rows)]
+
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(_count_band, bands))
+    else:
+        counts = [_count_band(band) for band in bands]
+
+    return sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+
+class GridWordSearch:
+    """Search a grid for many words at once in all 8 directions.
+
+    The words are compiled into one Aho-Corasick automaton. Each row, column
+    and diagonal is extracted once and run through it forwards and backwards,
+    so the cost is O(cells * directions) however many words there are.
+    """
+
+    def __init__(self, words):
+        self.words = list(dict.fromkeys(words))
+        if not all(self.words):
+            raise ValueError("words must be non-empty")
+
+        # Trie: goto[node] maps a letter to the child node
+        self.goto = [{}]
+        self.output = [[]]
+        for word_id, word in enumerate(self.words):
+            node = 0
+            for letter in word:
+                if letter not in self.goto[node]:
+                    self.goto.append({})
+                    self.output.append([])
+                    self.goto[node][letter] = len(self.goto) - 1
+                node = self.goto[node][letter]
+            self.output[node].append(word_id)
+
+        # Failure links in BFS order, inheriting the outputs of the fallback node
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for letter, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and letter not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(letter, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+                queue.append(child)
+
+    def _scan(self, text):
+        """Yield (end_index, word_id) for every match in text."""
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for i, letter in enumerate(text):
+            while node and letter not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(letter, 0)
+            for word_id in output[node]:
+                yield i, word_id
+
+    @staticmethod
+    def _lines(rows, cols):
+        """Yield (row, col, dx, dy, length) for every row, column and diagonal."""
+        for r in range(rows):
+            yield r, 0, 0, 1, cols
+        for c in range(cols):
+            yield 0, c, 1, 0, rows
+        for r in range(rows):
+            yield r, 0, 1, 1, min(rows - r, cols)
+            yield r, cols - 1, 1, -1, min(rows - r, cols)
+        for c in range(1, cols):
+            yield 0, c, 1, 1, min(rows, cols - c)
+            yield 0, cols - 1 - c, 1, -1, min(rows, cols - c)
+
+    def search(self, grid):
+        """Return {word: [(row, col, dx, dy), ...]} giving where each match starts and its direction."""
+        positions = {word: [] for word in self.words}
+        rows, cols = len(grid), len(grid[0]) if grid else 0
+
+        for r0, c0, dx, dy, length in self._lines(rows, cols):
+            text = "".join(grid[r0 + i * dx][c0 + i * dy] for i in range(length))
+            for end, word_id in self._scan(text):
+                start = end - len(self.words[word_id]) + 1
+                positions[self.words[word_id]].append((r0 + start * dx, c0 + start * dy, dx, dy))
+            for end, word_id in self._scan(text[::-1]):
+                start = length - 1 - (end - len(self.words[word_id]) + 1)
+                positions[self.words[word_id]].append((r0 + start * dx, c0 + start * dy, -dx, -dy))
+
+        return positions
+
+    def count(self, grid):
+        """Return {word: number of matches} across all 8 directions."""
+        return {word: len(found) for word, found in self.search(grid).items()}
+
+
 def main():
-    grid = read_input()
-    result1 = find_xmas(grid)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=ENGINES, default="python")
+    parser.add_argument("--tiled", action="store_true", help="memory-map the input and count it in row bands")
+    parser.add_argument("--workers", type=int, default=1, help="process pool size for --tiled")
+    args = parser.parse_args()
+
+    if args.tiled:
+        result1, result2 = count_xmas_tiled("input", workers=args.workers)
+    elif args.engine == "numpy":
+        grid = read_grid_array()
+        result1 = find_xmas_numpy(grid)
+        result2 = find_xmas_part2_numpy(grid)
+    else:
+        grid = read_input()
+        result1 = find_xmas(grid)
+        result2 = find_xmas_part2(grid)
     print(f"Part 1: XMAS appears {result1} times in the word search.")
-    result2 = find_xmas_part2(grid)
     print(f"Part 2: X-MAS appears {result2} times in the word search.")
 
 
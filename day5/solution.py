@@ -1,69 +1,78 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
 from collections import defaultdict, deque
-from typing import Dict, List, Set, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
 
-def parse_input(data: str) -> Tuple[Dict[int, Set[int]], List[List[int]]]:
-    # Parse rules and updates sections
-    rules_section, updates_section = data.strip().split('\n\n')
-    
-    # Parse rules into adjacency list (before -> set of after)
+VALID, INVALID, CYCLIC = "valid", "invalid", "cyclic"
+
+def parse_rules(lines: Iterable[str]) -> Dict[int, Set[int]]:
+    """Parse rule lines into adjacency list (before -> set of after), stopping at the first blank line."""
     rules: Dict[int, Set[int]] = defaultdict(set)
-    for line in rules_section.strip().split('\n'):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            break
         before, after = map(int, line.split('|'))
         rules[before].add(after)
-    
-    # Parse updates
-    updates = []
-    for line in updates_section.strip().split('\n'):
-        update = list(map(int, line.strip().split(',')))
-        updates.append(update)
-    
+    return rules
+
+def iter_updates(lines: Iterable[str]) -> Iterator[List[int]]:
+    """Lazily parse update lines, skipping blank ones."""
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield list(map(int, line.split(',')))
+
+def parse_input(data: str) -> Tuple[Dict[int, Set[int]], List[List[int]]]:
+    # Parse rules and updates sections
+    lines = iter(data.strip().split('\n'))
+    rules = parse_rules(lines)
+    updates = list(iter_updates(lines))
     return rules, updates
 
-def build_graph_for_update(rules: Dict[int, Set[int]], pages: List[int]) -> Dict[int, Set[int]]:
-    """Build a graph containing only rules relevant to the given pages."""
-    pages_set = set(pages)
-    graph = defaultdict(set)
-    
-    # Only include rules where both pages are in the update
-    for before, afters in rules.items():
-        if before in pages_set:
-            for after in afters:
-                if after in pages_set:
-                    graph[before].add(after)
-    
-    return graph
+class PageOrderIndex:
+    """Rule set compiled once so each update is checked without walking every rule.
+
+    Assumes the rules give a consistent order for every pair of pages that
+    appear together in an update, as the puzzle input does.
+    """
+
+    def __init__(self, rules: Dict[int, Set[int]]):
+        self.successors: Dict[int, Set[int]] = {before: set(afters) for before, afters in rules.items()}
+        self.pairs: Set[Tuple[int, int]] = {
+            (before, after) for before, afters in rules.items() for after in afters
+        }
+
+    def is_ordered(self, pages: List[int]) -> bool:
+        """O(k) check that every adjacent pair of pages follows a rule."""
+        return all((a, b) in self.pairs for a, b in zip(pages, pages[1:]))
+
+    def subgraph(self, pages: List[int]) -> Dict[int, Set[int]]:
+        """Graph of the rules between these pages, touching only their own rules."""
+        pages_set = set(pages)
+        graph = defaultdict(set)
+        for page in pages_set:
+            afters = self.successors.get(page)
+            if afters:
+                graph[page] = afters & pages_set
+        return graph
 
 def has_cycle(graph: Dict[int, Set[int]], pages: List[int]) -> bool:
-    """Check if the graph has a cycle using DFS."""
-    visited = set()
-    path = set()
-    
-    def dfs(node: int) -> bool:
-        if node in path:
-            return True  # Found cycle
-        if node in visited:
-            return False
-        
-        visited.add(node)
-        path.add(node)
-        
-        for next_node in graph[node]:
-            if dfs(next_node):
-                return True
-        
-        path.remove(node)
-        return False
-    
-    # Try starting from each node
-    for page in pages:
-        if page not in visited:
-            if dfs(page):
-                return True
-    
-    return False
+    """Check if the graph has a cycle: Kahn's algorithm leaves cycle nodes unsorted."""
+    return len(topological_sort(graph, pages)) < len(pages)
 
 def topological_sort(graph: Dict[int, Set[int]], pages: List[int]) -> List[int]:
-    """Return topologically sorted list of pages."""
+    """Return topologically sorted list of pages.
+    
+    Uses Kahn's algorithm, so pages on a cycle never reach in-degree 0 and are
+    left out: a result shorter than pages means the rules contain a cycle.
+    """
     # Calculate in-degree for each node
     in_degree = defaultdict(int)
     for node in pages:
@@ -92,67 +101,187 @@ def is_valid_order(sorted_pages: List[int], original_pages: List[int]) -> bool:
     # Build position lookup for original order
     pos = {page: i for i, page in enumerate(original_pages)}
     
-    # Check if relative positions match sorted order
-    for i in range(len(sorted_pages)):
-        for j in range(i + 1, len(sorted_pages)):
-            if pos[sorted_pages[i]] > pos[sorted_pages[j]]:
-                return False
-    
-    return True
+    # Positions only need to increase between consecutive sorted pages
+    return all(pos[a] < pos[b] for a, b in zip(sorted_pages, sorted_pages[1:]))
 
-def solve_part1(data: str) -> int:
-    rules, updates = parse_input(data)
-    total = 0
+def classify_updates(index: PageOrderIndex, updates: Iterable[List[int]]) -> Iterator[Tuple[List[int], str, List[int]]]:
+    """Yield (update, status, sorted_pages) for each update.
     
+    Updates whose adjacent pages all follow a rule are valid as they stand;
+    only the rest pay for a Kahn pass, which finds cycles and the fixed order.
+    """
     for update in updates:
-        # Build graph for this update
-        graph = build_graph_for_update(rules, update)
-        
-        # Skip if there's a cycle (impossible to satisfy)
-        if has_cycle(graph, update):
+        if index.is_ordered(update):
+            yield update, VALID, update
             continue
         
-        # Get topologically sorted order
-        sorted_pages = topological_sort(graph, update)
+        sorted_pages = topological_sort(index.subgraph(update), update)
         
-        # Check if original order is valid
-        if is_valid_order(sorted_pages, update):
-            # Add middle page number
-            middle_idx = len(update) // 2
-            total += update[middle_idx]
+        # Pages left unsorted sit on a cycle (impossible to satisfy)
+        if len(sorted_pages) < len(update):
+            yield update, CYCLIC, sorted_pages
+        elif is_valid_order(sorted_pages, update):
+            yield update, VALID, sorted_pages
+        else:
+            yield update, INVALID, sorted_pages
+
+def sum_middle_pages(index: PageOrderIndex, updates: Iterable[List[int]]) -> Tuple[int, int]:
+    """Sum the middle pages of valid updates (part 1) and of fixed invalid ones (part 2)."""
+    part1 = part2 = 0
+    for update, status, sorted_pages in classify_updates(index, updates):
+        if status == VALID:
+            part1 += update[len(update) // 2]
+        elif status == INVALID:
+            # The topological order is the corrected update
+            part2 += sorted_pages[len(sorted_pages) // 2]
+    return part1, part2
+
+def solve_lines(lines: Iterable[str]) -> Tuple[int, int]:
+    """Solve both parts from input lines; updates are streamed, never stored."""
+    lines = iter(lines)
+    index = PageOrderIndex(parse_rules(lines))
+    return sum_middle_pages(index, iter_updates(lines))
+
+# Compiled rules for pool workers, set once per process by _init_worker
+_worker_index = None
+
+def _init_worker(index: PageOrderIndex) -> None:
+    # Under fork the index is inherited copy-on-write; otherwise it is
+    # pickled once per worker rather than once per task
+    global _worker_index
+    _worker_index = index
+
+def _solve_shard(updates: List[List[int]]) -> Tuple[int, int]:
+    return sum_middle_pages(_worker_index, updates)
+
+def solve_file_parallel(filename: str = "input", workers: int = None, shard_size: int = 10000) -> Tuple[int, int]:
+    """Solve both parts with update shards spread over a process pool."""
+    workers = workers or os.cpu_count()
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    totals = [0, 0]
+    
+    def collect(futures):
+        for future in futures:
+            for part, value in enumerate(future.result()):
+                totals[part] += value
+    
+    with open(filename) as f:
+        index = PageOrderIndex(parse_rules(f))
+        updates = iter_updates(f)
+        with ProcessPoolExecutor(workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(index,)) as pool:
+            # Keep only a few shards in flight so the file is still streamed
+            pending = set()
+            for shard in iter(lambda: list(islice(updates, shard_size)), []):
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(_solve_shard, shard))
+            collect(pending)
     
-    return total
+    return totals[0], totals[1]
+
+def solve(data: str) -> Tuple[int, int]:
+    return solve_lines(data.strip().split('\n'))
+
+def solve_file(filename: str = "input") -> Tuple[int, int]:
+    with open(filename) as f:
+        return solve_lines(f)
+
+def solve_part1(data: str) -> int:
+    return solve(data)[0]
 
 def solve_part2(data: str) -> int:
-    rules, updates = parse_input(data)
-    total = 0
+    return solve(data)[1]
+
+def _has_cycle_dfs(graph: Dict[int, Set[int]], pages: List[int]) -> bool:
+    """Reference recursive-DFS cycle check that Kahn's algorithm replaced."""
+    visited = set()
+    path = set()
     
-    for update in updates:
-        # Build graph for this update
-        graph = build_graph_for_update(rules, update)
+    def dfs(node: int) -> bool:
+        if node in path:
+            return True  # Found cycle
+        if node in visited:
+            return False
         
-        # Skip if there's a cycle (impossible to satisfy)
-        if has_cycle(graph, update):
-            continue
+        visited.add(node)
+        path.add(node)
         
-        # Get topologically sorted order
-        sorted_pages = topological_sort(graph, update)
+        for next_node in graph[node]:
+            if dfs(next_node):
+                return True
         
-        # If original order is NOT valid
-        if not is_valid_order(sorted_pages, update):
-            # Create mapping from sorted order to original pages
-            pos_map = {page: i for i, page in enumerate(sorted_pages)}
-            
-            # Sort the original pages according to the topological order
-            sorted_update = sorted(update, key=lambda x: pos_map[x])
-            
-            # Add middle page number
-            middle_idx = len(sorted_update) // 2
-            total += sorted_update[middle_idx]
+        path.remove(node)
+        return False
+    
+    return any(page not in visited and dfs(page) for page in pages)
+
+def _is_valid_order_pairwise(sorted_pages: List[int], original_pages: List[int]) -> bool:
+    """Reference O(k^2) version of is_valid_order."""
+    pos = {page: i for i, page in enumerate(original_pages)}
+    for i in range(len(sorted_pages)):
+        for j in range(i + 1, len(sorted_pages)):
+            if pos[sorted_pages[i]] > pos[sorted_pages[j]]:
+                return False
+    return True
+
+def _classify_legacy(index: PageOrderIndex, update: List[int]) -> str:
+    """Reference per-update check: recursive DFS cycle test, then the O(k^2) order test."""
+    graph = index.subgraph(update)
+    if _has_cycle_dfs(graph, update):
+        return CYCLIC
+    if _is_valid_order_pairwise(topological_sort(graph, update), update):
+        return VALID
+    return INVALID
+
+def benchmark(page_counts: Tuple[int, ...] = (1000, 2000), updates: int = 5) -> None:
+    """Time classify_updates on long updates against the DFS + O(k^2) version.
     
-    return total
+    The rules are compiled up front, so only the per-update work is timed,
+    including building the rule subgraph for updates that need one.
+    """
+    rng = random.Random(0)
+    for k in page_counts:
+        order = rng.sample(range(10 * k), k)
+        index = PageOrderIndex({page: set(order[i + 1:]) for i, page in enumerate(order)})
+        batch = []
+        for _ in range(updates):
+            update = rng.sample(order, k - 1)
+            if rng.random() < 0.5:
+                update.sort(key=order.index)
+            batch.append(update)
+        
+        start = time.perf_counter()
+        new = [status for _, status, _ in classify_updates(index, batch)]
+        new_time = time.perf_counter() - start
+        
+        # The recursive DFS needs one frame per page on a long chain
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, 2 * k + 100))
+        try:
+            start = time.perf_counter()
+            old = [_classify_legacy(index, update) for update in batch]
+            old_time = time.perf_counter() - start
+        finally:
+            sys.setrecursionlimit(limit)
+        
+        assert new == old
+        valid = new.count(VALID)
+        print(f"{k} pages x {updates} updates ({valid} valid): "
+              f"O(k) pair check, Kahn O(k + edges) on failures {new_time:.3f}s; "
+              f"DFS + O(k^2) {old_time:.3f}s")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true", help="benchmark long updates and exit")
+    parser.add_argument("--workers", type=int, default=1, help="check update shards in N processes")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark()
+        raise SystemExit
+    
     # Test with sample input first
     sample_input = """47|53
 97|13
@@ -184,6 +313,7 @@ if __name__ == "__main__":
 97,13,75,29,47"""
 
     print("Testing with sample input...")
+    assert solve(sample_input) == (143, 123)
     result = solve_part1(sample_input)
     print(f"Test result part 1: {result}")
     assert result == 143, f"Test failed! Expected 143, got {result}"
@@ -194,10 +324,9 @@ if __name__ == "__main__":
 
     # Now try real input
     print("\nSolving with real input...")
-    with open("input") as f:
-        data = f.read()
-    result = solve_part1(data)
-    print(f"Part 1 result: {result}")
-    
-    result = solve_part2(data)
-    print(f"Part 2 result: {result}")
+    if args.workers > 1:
+        result1, result2 = solve_file_parallel("input", args.workers)
+    else:
+        result1, result2 = solve_file("input")
+    print(f"Part 1 result: {result1}")
+    print(f"Part 2 result: {result2}")